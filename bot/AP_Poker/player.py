@@ -8,9 +8,18 @@ from skeleton.bot import Bot
 from skeleton.runner import parse_args, run_bot
 
 import eval7
+import numpy as np
 import random
-import pandas as pd
+import csv
+import array
+import io
+import sys
 import math
+import itertools
+import multiprocessing
+import atexit
+import os
+import time
 
 NUMS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K']
 SUITS = ['s', 'c', 'd', 'h']
@@ -20,7 +29,16 @@ for i in range(13):
     for j in range(4):
         FULL_DECK.append(NUMS[i] + SUITS[j])
 
-_MONTE_CARLO_ITERS = 400
+CARD_OBJ = {card: eval7.Card(card) for card in FULL_DECK} # build every eval7 card once, instead of once per Monte Carlo sample
+FULL_DECK_EVAL7 = list(CARD_OBJ.values())
+IDX_OF = {card: i for i, card in enumerate(FULL_DECK)} # card string -> index into FULL_DECK and FULL_DECK_EVAL7
+FULL_MASK = (1 << 52) - 1 # every card in the deck, as a bitmask over FULL_DECK indices
+
+_MONTE_CARLO_ITERS = 400 # where we start, adjust_iters tunes this to our game clock
+_MIN_ITERS = 100
+_MAX_ITERS = 2000 # past this the estimate barely moves, and one slow round could eat our clock
+_CLOCK_RESERVE = 3 # seconds of game clock we never plan to spend
+_EXP_TABLE_STEPS = 2 * _MAX_ITERS # resolution of our raise curve table, a Monte Carlo strength is always k / (2 * iters)
 
 _INTIMIDATION_THRESHOLD = 0
 # _RAISE_MIN_STR = {'pre': 0.5949558282767977, 'post': 0.7589461055235294}
@@ -44,8 +62,128 @@ _RAISE_MIN_STR = {'pre': 0.6066179515462299, 'post': 0.7212909509127321}
 _CALL_MIN_STR = {'pre': 0.5570778707878955, 'post': 0.6207629881906793}
 _RAISE_VALUES = {'exp': 1.8301191486578343, 'const': 14.439631715170798}
 
+# the parameters mutate() nudges, and how wide each nudge can be (before scaling down over the game)
+_MUTATION_TARGETS = ((_RAISE_MIN_STR, 'pre'), (_RAISE_MIN_STR, 'post'), (_CALL_MIN_STR, 'pre'), (_CALL_MIN_STR, 'post'), (_RAISE_VALUES, 'exp'), (_RAISE_VALUES, 'const'))
+_MUTATION_WIDTHS = (0.05, 0.05, 0.05, 0.05, 0.1, 4)
+
+_LOG_FLUSH_ROUNDS = 50 # write our buffered log to stdout this often, printing every round blocks on the pipe
+
 
 RANK_DICT = {'2':2, '3':3, '4':4, '5':5, '6':6, '7':7, '8':8, '9':9, 'T':10, 'J':11, 'Q':12, 'K':13, 'A':14}
+CARD_RANK = {card: RANK_DICT[card[0]] for card in FULL_DECK} # numeric rank of every card, a sort key without any method calls
+
+def _hand_id(rank_high, rank_low, suited):
+    '''
+    Canonical integer id (0 to 337) of a starting hand, used to index our strength array.
+
+    Arguments:
+    rank_high, rank_low: numeric ranks of the two cards (2 to 14), rank_high >= rank_low
+    suited: True if both cards share a suit
+    '''
+    return (rank_high - 2) * 26 + (rank_low - 2) * 2 + int(suited)
+
+
+def _hand_id_of(card_1, card_2):
+    '''
+    Canonical integer id of the hole made by two card strings in the engine's format (Kd, As, Th, 7d, etc.)
+    '''
+    rank_1, rank_2 = RANK_DICT[card_1[0]], RANK_DICT[card_2[0]]
+    if rank_1 < rank_2:
+        rank_1, rank_2 = rank_2, rank_1
+    return _hand_id(rank_1, rank_2, card_1[1] == card_2[1])
+
+
+def _mc_equity(priv_idx, pub_idx, deck_idx, iters, rng):
+    '''
+    Monte Carlo kernel behind public_eval. Plays out 'iters' random showdowns
+    against a random opponent hole and returns our score (2 per win, 1 per tie).
+    All of the random draws are made up front in one numpy call, so the loop
+    only has to evaluate hands.
+
+    Arguments:
+    priv_idx: list of our 2 hole card indices
+    pub_idx: list of the known community card indices
+    deck_idx: list of the card indices still in the deck
+    iters: the number of Monte Carlo samples to take
+    rng: the numpy Generator to draw with
+    '''
+    evaluate = eval7.evaluate
+    cards = FULL_DECK_EVAL7
+
+    priv_e = [cards[i] for i in priv_idx] # convert our known cards once, not every iteration
+    pub_e = [cards[i] for i in pub_idx]
+
+    _OPP = 2
+    _DRAW = _OPP + 5 - len(pub_idx) # 2 cards for opp_hole, and 5 - street cards for hidden_public
+
+    # every row is an independent draw without replacement: the positions of the _DRAW smallest of a row of random keys
+    order = rng.random((iters, len(deck_idx))).argpartition(_DRAW, axis=1)[:, :_DRAW]
+    draws = np.array(cards, dtype=object)[np.array(deck_idx)[order]].tolist() # straight to eval7 cards, opp_hole first then hidden_public
+
+    # two 7 card buffers: the known cards go in once, each sample only overwrites the drawn slots
+    n_known = len(pub_idx)
+    my_hand = priv_e + pub_e + [None] * (_DRAW - _OPP)
+    opp_hand = pub_e + [None] * _DRAW
+    score = 0
+
+    for draw in draws:
+        opp_hand[n_known:] = draw
+        my_hand[_OPP + n_known:] = draw[_OPP:] # both hands share the same hidden_public
+
+        my_strength = evaluate(my_hand)
+        opp_strength = evaluate(opp_hand)
+
+        score += (my_strength > opp_strength) + (my_strength >= opp_strength) # 2 for a win, 1 for a tie, no branches
+
+    return score
+
+
+_NP_RNG = np.random.default_rng() # our draws, each pool worker gets its own in _seed_worker
+
+
+def public_eval(private, public, street, iters):
+    '''
+    evaluate current combined hand with hole + community cards, then calculate pot odds by running through all other cards.
+    Lives at module level so our worker processes can run it.
+
+    params: private and public cards as FULL_DECK indices, street, number of Monte Carlo iters
+    '''
+    used = 0 # bitmask of the cards we can see, bit i is FULL_DECK[i]
+    for i in private:
+        used |= 1 << i
+    for i in public:
+        used |= 1 << i
+    free = FULL_MASK ^ used
+    deck_idx = [i for i in range(52) if free >> i & 1] # the cards left in the deck, as indices
+
+    score = _mc_equity(private, public, deck_idx, iters, _NP_RNG) # the whole Monte Carlo loop lives in one tight function
+
+    return score/(2 * iters)
+
+
+_POOL = None
+
+def get_pool():
+    '''
+    Returns our process pool for running Monte Carlo on several boards at once,
+    making it the first time we ask. Spawning processes is slow, so we only ever make one.
+    Returns None on a single core machine, where the pool would only add overhead.
+    '''
+    global _POOL
+    if _POOL is None and (os.cpu_count() or 1) > 1:
+        _POOL = multiprocessing.Pool(NUM_BOARDS, initializer=_seed_worker)
+        atexit.register(_POOL.terminate) # shut the workers down ourselves, leaving it to Pool.__del__ at exit throws
+    return _POOL
+
+
+def _seed_worker():
+    '''
+    Gives each worker process its own random state. Forked workers start as copies
+    of ours, so without this every worker would draw the exact same cards.
+    '''
+    global _NP_RNG
+    _NP_RNG = np.random.default_rng(os.getpid() ^ time.time_ns())
+
 
 class Player(Bot):
     '''
@@ -62,35 +200,39 @@ class Player(Bot):
         Returns:
         Nothing.
         ''' 
-        self.board_allocations = [[], [], []] # keep track of our allocations at round start
+        self.board_allocations = [(), (), ()] # keep track of our allocations at round start, as (i, j) tuples of FULL_DECK indices
         self.hole_strengths = [0, 0, 0] # better representation of our hole strengths per round (win probability!)
         # self.parameters = {'pr':0, 'pc':1, 'pf':0}
 
         self.total_payoffs = 0
         self.mutated = False
-        self.draise_pre = 0
-        self.draise_post = 0
-        self.dcall_pre = 0
-        self.dcall_post = 0
-        self.draise_exp = 0
-        self.draise_const = 0
-
-        # make sure this df isn't too big!! Loading data all at once might be slow if you did more computations!
-        calculated_df = pd.read_csv('hole_strengths.csv') # the values we computed offline, this df is slow to search through though
-        holes = calculated_df.Holes # the columns of our spreadsheet
-        strengths = calculated_df.Strengths
-        self.starting_strengths = dict(zip(holes, strengths)) # convert to a dictionary, O(1) lookup time!
-
-
-    def rank_to_numeric(self, rank):
-        '''
-        Method that converts our given rank as a string
-        into an integer ranking
-
-        rank: str - one of 'A, K, Q, J, T, 9, 8, 7, 6, 5, 4, 3, 2'
-        '''
-
-        return RANK_DICT[rank]
+        self.deltas = array.array('d', [0] * len(_MUTATION_TARGETS)) # our current mutation, lined up with _MUTATION_TARGETS
+        self.log = io.StringIO() # buffered output, see flush_log
+        self.equity_cache = {}
+        self._assigned = False
+        self._rng = random.Random() # our own random state for betting and mutation decisions
+        self.build_exp_table()
+
+        self._strength_arr = [0] * 338 # index by _hand_id, much cheaper than hashing a key string
+        with open('hole_strengths.csv', newline='') as strengths_file: # the values we computed offline, plain csv so we don't pay for importing pandas
+            rows = csv.reader(strengths_file)
+            next(rows) # skip the Holes,Strengths header
+            for hole, strength in rows:
+                self._strength_arr[_hand_id(RANK_DICT[hole[0]], RANK_DICT[hole[1]], hole[2] == 's')] = float(strength)
+
+        self.pair_strengths = [0] * (52 * 52) # strength of every hole by deck indices, pair_strengths[52 * i + j] == pair_strengths[52 * j + i]
+        for i in range(52):
+            for j in range(52):
+                if i != j:
+                    self.pair_strengths[52 * i + j] = self._strength_arr[_hand_id_of(FULL_DECK[i], FULL_DECK[j])]
+
+        self.pool = get_pool() # start our Monte Carlo workers now, before the game clock matters
+
+        self._iters = _MONTE_CARLO_ITERS # Monte Carlo samples per board, tuned every round by adjust_iters
+        self._round_elapsed = 0 # seconds we spent in get_actions this round
+        self._round_ran_mc = False # did we run any Monte Carlo this round?
+        self._last_round_elapsed = 0 # the last round that ran Monte Carlo: how long it took...
+        self._last_round_iters = _MONTE_CARLO_ITERS # ...and with how many iters
 
 
     def sort_cards_by_rank(self, cards):
@@ -100,31 +242,7 @@ class Player(Bot):
 
         cards: list - a list of card strings in the engine's format (Kd, As, Th, 7d, etc.)
         '''
-        return sorted(cards, reverse=True, key=lambda x: self.rank_to_numeric(x[0])) # we want it in descending order
-
-
-    def hole_list_to_key(self, hole):
-        '''
-        Converts a hole card list into a key that we can use to query our 
-        strength dictionary
-
-        hole: list - A list of two card strings in the engine's format (Kd, As, Th, 7d, etc.)
-        '''
-        card_1 = hole[0] # get all of our relevant info
-        card_2 = hole[1]
-
-        rank_1, suit_1 = card_1[0], card_1[1] # card info
-        rank_2, suit_2 = card_2[0], card_2[1]
-
-        numeric_1, numeric_2 = self.rank_to_numeric(rank_1), self.rank_to_numeric(rank_2) # make numeric
-
-        suited = suit_1 == suit_2 # off-suit or not
-        suit_string = 's' if suited else 'o'
-
-        if numeric_1 >= numeric_2: # keep our hole cards in rank order
-            return rank_1 + rank_2 + suit_string
-        else:
-            return rank_2 + rank_1 + suit_string
+        return sorted(cards, reverse=True, key=CARD_RANK.__getitem__) # we want it in descending order
 
 
     def allocate_cards(self, my_cards):
@@ -138,58 +256,26 @@ class Player(Bot):
         my_cards: a list of the 6 cards given to us at round start
         '''
         my_cards = self.sort_cards_by_rank(my_cards)
-        holes_allocated = []
-        for k in range(3):
-            max_strength_hole = 0
-            temp_cards = []
-
-            for i in range(len(my_cards)-1):
-                for j in range(i+1, len(my_cards)):
-                    hole_list = [my_cards[i], my_cards[j]]
-                    temp_hole = self.hole_list_to_key(hole_list)
-                    strength = self.starting_strengths[temp_hole]
-
-                    if strength > max_strength_hole:
-                        temp_cards = hole_list
-                        max_strength_hole = strength
-
-            self.board_allocations[2-k] = temp_cards
-            self.hole_strengths[2-k] = max_strength_hole
-            my_cards.remove(temp_cards[0]) 
-            my_cards.remove(temp_cards[1])
-            
+        card_idx = [IDX_OF[card] for card in my_cards]
 
-    def public_eval(self, private, public, street, iters):
-        """
-        evaluate current combined hand with hole + community cards, then calculate pot odds by running through all other cards
+        pairs = [] # score every possible hole just once, C(6, 2) = 15 of them
+        for i, j in itertools.combinations(range(len(my_cards)), 2):
+            strength = self.pair_strengths[52 * card_idx[i] + card_idx[j]]
+            pairs.append((strength, i, j))
+        pairs.sort(key=lambda pair: pair[0], reverse=True) # strongest first, ties keep their original order
 
-        params: tuple of private_cards, tuple of public_cards
-        """
+        used = [False] * len(my_cards)
+        k = 0
+        for strength, i, j in pairs: # greedily take the strongest hole that doesn't reuse a card
+            if used[i] or used[j]:
+                continue
+            used[i] = used[j] = True
 
-        _PUB = 5 - street # number of public cards to be drawn (turn/river)
-        _OPP = 2
-        score = 0
-
-        remaining_cards = set(FULL_DECK)
-        remaining_cards -= set(private)
-        remaining_cards -= set(public)
-        
-        for _ in range(iters):
-            draw = random.sample(remaining_cards, _OPP + _PUB) # pull 2 cards for opp_hole, and 5 - street cards for hidden_public (depending on turn and river)
-            opp_hole = draw[:_OPP]
-            hidden_public = draw[_OPP:]
-
-            my_strength = eval7.evaluate([eval7.Card(card) for card in tuple(private + public + hidden_public)])
-            opp_strength = eval7.evaluate([eval7.Card(card) for card in tuple(opp_hole + public + hidden_public)])
-
-            if my_strength > opp_strength:
-                score += 2
-            elif my_strength == opp_strength:
-                score += 1
-            else:
-                pass
-
-        return score/(2 * iters)
+            self.board_allocations[2-k] = (card_idx[i], card_idx[j])
+            self.hole_strengths[2-k] = strength
+            k += 1
+            if k == 3:
+                break
 
 
     # def cfr(self, history, p0, p1):
@@ -224,48 +310,33 @@ class Player(Bot):
             # self.adjust_iters(game_state)
             if self.total_payoffs < 6 * mutate_iters:
                 if not self.mutated:
-                    print('went extinct :( new mutation...')
+                    print('went extinct :( new mutation...', file=self.log)
                     self.mutated = True
 
-                    self.draise_pre = (random.random() * 0.05 - 0.025)/math.sqrt(round_num / mutate_iters)
-                    self.draise_post = (random.random() * 0.05 - 0.025)/math.sqrt(round_num / mutate_iters)
-                    self.dcall_pre = (random.random() * 0.05 - 0.025)/math.sqrt(round_num / mutate_iters)
-                    self.dcall_post = (random.random() * 0.05 - 0.025)/math.sqrt(round_num / mutate_iters)
-                    self.draise_exp = (random.random() * 0.1 - 0.05)/math.sqrt(round_num / mutate_iters)
-                    self.draise_const = (random.random() * 4 - 2)/math.sqrt(round_num / mutate_iters)
-
+                    scale = 1 / math.sqrt(round_num / mutate_iters) # smaller mutations as the game goes on
+                    self.deltas = array.array('d', [(self._rng.random() - 0.5) * width * scale for width in _MUTATION_WIDTHS])
 
-                    _RAISE_MIN_STR['pre'] += self.draise_pre
-                    _RAISE_MIN_STR['post'] += self.draise_post
-                    _CALL_MIN_STR['pre'] += self.dcall_pre
-                    _CALL_MIN_STR['post'] += self.dcall_post
-                    _RAISE_VALUES['exp'] += self.draise_exp
-                    _RAISE_VALUES['const'] += self.draise_const
+                    for (params, key), delta in zip(_MUTATION_TARGETS, self.deltas):
+                        params[key] += delta
 
-                    print('_RAISE_MIN_STR =', _RAISE_MIN_STR)
-                    print('_CALL_MIN_STR =', _CALL_MIN_STR)
-                    print('_RAISE_VALUES =', _RAISE_VALUES)
+                    self.build_exp_table()
+                    self.log_params()
 
                 else:
-                    print('went extinct again :( flipping mutation...')
+                    print('went extinct again :( flipping mutation...', file=self.log)
                     self.mutated = False
 
-                    _RAISE_MIN_STR['pre'] -= self.draise_pre
-                    _RAISE_MIN_STR['post'] -= self.draise_post
-                    _CALL_MIN_STR['pre'] -= self.dcall_pre
-                    _CALL_MIN_STR['post'] -= self.dcall_post
-                    _RAISE_VALUES['exp'] -= self.draise_exp
-                    _RAISE_VALUES['const'] -= self.draise_const
+                    for (params, key), delta in zip(_MUTATION_TARGETS, self.deltas):
+                        params[key] -= delta
 
-                    print('_RAISE_MIN_STR =', _RAISE_MIN_STR)
-                    print('_CALL_MIN_STR =', _CALL_MIN_STR)
-                    print('_RAISE_VALUES =', _RAISE_VALUES)
+                    self.build_exp_table()
+                    self.log_params()
             
             elif self.total_payoffs == 6 * mutate_iters:
-                print('tie?!?!?!')
+                print('tie?!?!?!', file=self.log)
 
             else:
-                print('did well :)')
+                print('did well :)', file=self.log)
 
                 # if self.mutated: # repeating good mutation until it passes maximum
                 #     print('mutating further...')
@@ -302,6 +373,34 @@ class Player(Bot):
             
 
 
+    def build_exp_table(self):
+        '''
+        Precomputes the exponential part of our post-flop raise curve for every strength
+        on a 1 / _EXP_TABLE_STEPS grid, so get_actions can index instead of calling exp.
+        Has to be rebuilt whenever _RAISE_VALUES['exp'] changes.
+        '''
+        strengths = np.arange(_EXP_TABLE_STEPS + 1) / _EXP_TABLE_STEPS
+        self.exp_table = np.exp(_RAISE_VALUES['exp'] * (strengths - 0.321875)).tolist() # a list is faster to index one value at a time
+
+
+    def log_params(self):
+        '''
+        Writes our current strategy parameters to the log buffer.
+        '''
+        print('_RAISE_MIN_STR =', _RAISE_MIN_STR, file=self.log)
+        print('_CALL_MIN_STR =', _CALL_MIN_STR, file=self.log)
+        print('_RAISE_VALUES =', _RAISE_VALUES, file=self.log)
+
+
+    def flush_log(self):
+        '''
+        Writes everything buffered in self.log to stdout in one go, and empties the buffer.
+        '''
+        sys.stdout.write(self.log.getvalue())
+        sys.stdout.flush()
+        self.log = io.StringIO()
+
+
     def handle_new_round(self, game_state, round_state, active):
         '''
         Called when a new round starts. Called NUM_ROUNDS times.
@@ -321,17 +420,32 @@ class Player(Bot):
         my_cards = round_state.hands[active] # your six cards at the start of the round
         big_blind = bool(active) # True if you are the big blind
 
+        self.equity_cache = {} # (hole, public cards) -> Monte Carlo strength, only good for this round
+        self._assigned = False # have we sent our AssignActions yet this round?
         self.allocate_cards(my_cards)
 
     
-    def adjust_iters(self, game_state): # TODO fix _MONTE_CARLO_ITERS
+    def adjust_iters(self, game_state):
+        '''
+        Scales our Monte Carlo iterations so the time we spend per round matches the
+        time we can afford per round. Works from the last round that ran Monte Carlo,
+        and moves at most a factor of 2 from it so one odd round can't throw us off.
+        Only reads our measurements, so it is safe to call before every decision.
+
+        Arguments:
+        game_state: the GameState object.
+        '''
         game_clock = game_state.game_clock
         round_num = game_state.round_num
 
-        rounds_frac = round_num/NUM_ROUNDS
-        time_frac = (30 - game_clock)/30
+        rounds_left = max(1, NUM_ROUNDS - round_num + 1)
+        budget_per_round = 0.9 * max(0, game_clock - _CLOCK_RESERVE) / rounds_left # keep some slack for everything else
 
-        _MONTE_CARLO_ITERS = int(_MONTE_CARLO_ITERS * rounds_frac/time_frac * 0.9)
+        if self._last_round_elapsed > 0: # nothing to scale from until we've timed a Monte Carlo round
+            last_iters = self._last_round_iters
+            target = last_iters * budget_per_round / self._last_round_elapsed
+            target = min(2 * last_iters, max(last_iters / 2, target))
+            self._iters = min(_MAX_ITERS, max(_MIN_ITERS, int(target)))
 
 
     def handle_round_over(self, game_state, terminal_state, active):
@@ -355,15 +469,24 @@ class Player(Bot):
             my_cards = previous_board_state.hands[active] # your cards
             opp_cards = previous_board_state.hands[1-active] # opponent's cards or [] if not revealed
         
-        self.board_allocations = [[], [], []] # reset our variables at the end of every round!
+        self.board_allocations = [(), (), ()] # reset our variables at the end of every round!
         self.hole_strengths = [0, 0, 0]
         self.last_seen_street = 0
 
+        if self._round_ran_mc: # rounds without Monte Carlo tell adjust_iters nothing
+            self._last_round_elapsed = self._round_elapsed
+            self._last_round_iters = self._iters
+        self._round_elapsed = 0
+        self._round_ran_mc = False
+
         game_clock = game_state.game_clock # check how much time we have remaining at the end of a game
         round_num = game_state.round_num # Monte Carlo takes a lot of time, we use this to adjust!
 
         self.mutate(game_state, terminal_state, active)
 
+        if round_num % _LOG_FLUSH_ROUNDS == 0 or round_num == NUM_ROUNDS:
+            self.flush_log()
+
         if round_num == NUM_ROUNDS:
             print(game_clock)
         
@@ -381,6 +504,14 @@ class Player(Bot):
         Returns:
         Your actions.
         '''
+        if not self._assigned: # assigning only ever happens on our first action of a round, on every board at once
+            if AssignAction in round_state.legal_actions()[0]:
+                self._assigned = True
+                return [AssignAction([FULL_DECK[j] for j in cards]) for cards in self.board_allocations] # the engine wants card strings
+
+        start_time = time.perf_counter() # adjust_iters needs to know how long we take
+        self.adjust_iters(game_state) # pick our Monte Carlo iters from the clock we have right now
+
         legal_actions = round_state.legal_actions() # the actions you are allowed to take
         street = round_state.street # 0, 3, 4, or 5 representing pre-flop, flop, turn, or river respectively
         my_cards = round_state.hands[active] # your cards across all boards
@@ -394,13 +525,45 @@ class Player(Bot):
         net_upper_raise_bound = round_state.raise_bounds()[1] # max raise across 3 boards
         net_cost = 0 # keep track of the net additional amount you are spending across boards this round
 
+        post_strengths = [None] * NUM_BOARDS # Monte Carlo strengths for the boards past the flop
+        if street >= 3:
+            jobs = [] # first pass: find the boards that still need an equity estimate
+            job_boards = []
+            for i in range(NUM_BOARDS):
+                if not isinstance(round_state.board_states[i], TerminalState):
+                    public = tuple(IDX_OF[card] for card in board_cards[i][:street])
+                    cached = self.equity_cache.get((self.board_allocations[i], public))
+                    if cached is not None: # we already estimated this exact spot earlier this street
+                        post_strengths[i] = cached
+                    else:
+                        jobs.append((self.board_allocations[i], public, street, self._iters))
+                        job_boards.append(i)
+
+            if self.pool is not None and len(jobs) >= 2: # worth sending to our workers
+                strengths = self.pool.starmap(public_eval, jobs)
+            else:
+                strengths = [public_eval(*job) for job in jobs]
+
+            for i, strength, job in zip(job_boards, strengths, jobs):
+                post_strengths[i] = strength
+                self.equity_cache[job[0], job[1]] = strength
+
+            if jobs:
+                self._round_ran_mc = True
+
+        state_str = 'pre' if street < 3 else 'post' # look up everything that is fixed for this street just once
+        raise_min_str = _RAISE_MIN_STR[state_str]
+        call_min_str = _CALL_MIN_STR[state_str]
+        exp_table = self.exp_table
+        raise_const = _RAISE_VALUES['const']
+        street_sq = street * street
+        sqrt = math.sqrt
+        rng_random = self._rng.random
+
         my_actions = [None] * NUM_BOARDS
         for i in range(NUM_BOARDS):
-            cards = self.board_allocations[i] # assign our cards that we made earlier
-            if AssignAction in legal_actions[i]:
-                my_actions[i] = AssignAction(cards) # add to our actions
-                
-            elif isinstance(round_state.board_states[i], TerminalState): # make sure the game isn't over at this board
+            cards = self.board_allocations[i] # the cards we assigned to this board earlier
+            if isinstance(round_state.board_states[i], TerminalState): # make sure the game isn't over at this board
                 my_actions[i] = CheckAction() # check if it is
             
             else: # do we add more resources?
@@ -410,22 +573,20 @@ class Player(Bot):
                 min_raise, max_raise = round_state.board_states[i].raise_bounds(active, round_state.stacks)
 
                 if street < 3: # pre-flop
-                    state_str = 'pre'
-                    strength = self.hole_strengths[i] # pull from hole_strengths.csv
-                    if self.starting_strengths[self.hole_list_to_key(cards)] > _RAISE_MIN_STR[state_str]:
+                    strength = self.hole_strengths[i] # pull from hole_strengths.csv, saved by allocate_cards
+                    if strength > raise_min_str:
                         raise_amount = int(my_pips[i] + board_cont_cost + (strength - 0.5) * 10) # play conservative pre-flop
                     else: 
                         raise_amount = 0 # min_raise
                 else:
-                    state_str = 'post'
-                    strength = self.public_eval(cards, board_cards[i][:street], street, _MONTE_CARLO_ITERS) # run Monte Carlo sims to estimate str of hand
+                    strength = post_strengths[i] # from our Monte Carlo sims above
                     # print('hole:', cards)
                     # print('pub:', board_cards[i][:street])
                     # print('strength:', strength)
-                    if strength > _RAISE_MIN_STR[state_str]:
+                    if strength > raise_min_str:
                         # raise_amount = int(my_pips[i] + board_cont_cost + street/2 * math.sqrt(strength - 0.5) * 50) # raise the stakes deeper into the game
                         # raise_amount = int(my_pips[i] + board_cont_cost + street * math.exp(6.1 * (strength - 0.321875)) - 8.8)
-                        raise_amount = int(my_pips[i] + board_cont_cost + street**2 * math.exp(_RAISE_VALUES['exp'] * (strength - 0.321875)) - _RAISE_VALUES['const'])
+                        raise_amount = int(my_pips[i] + board_cont_cost + street_sq * exp_table[int(strength * _EXP_TABLE_STEPS + 0.5)] - raise_const)
                     else:
                         raise_amount = 0 # min_raise
 
@@ -459,17 +620,17 @@ class Player(Bot):
                         else:
                             # * math.sqrt(9 - street)/2 
                             # * math.sqrt(20 + street)/5
-                            intimidation = 0.05 * math.sqrt(board_cont_cost - _INTIMIDATION_THRESHOLD) * math.sqrt(strength)
+                            intimidation = 0.05 * sqrt(board_cont_cost - _INTIMIDATION_THRESHOLD) * sqrt(strength)
                             strength = max(0, strength - intimidation) # if our opp raises a lot, be cautious!
 
                     pot_odds = board_cont_cost / (pot_total + board_cont_cost)
 
                     if strength >= pot_odds: # Positive Expected Value!! at least call!!
-                        if random.random() < 1.4 * strength and preintimidation_strength > _RAISE_MIN_STR[state_str]: # raise sometimes, more likely if our hand is strong
+                        if rng_random() < 1.4 * strength and preintimidation_strength > raise_min_str: # raise sometimes, more likely if our hand is strong
                             my_actions[i] = commit_action
                             net_cost += commit_cost
                         
-                        elif (math.sqrt(board_cont_cost - _INTIMIDATION_THRESHOLD) < 6 and preintimidation_strength > _CALL_MIN_STR[state_str]) or preintimidation_strength > _RAISE_MIN_STR[state_str]: # try to call if we don't raise
+                        elif (sqrt(board_cont_cost - _INTIMIDATION_THRESHOLD) < 6 and preintimidation_strength > call_min_str) or preintimidation_strength > raise_min_str: # try to call if we don't raise
                             if (board_cont_cost <= my_stack - net_cost): # we call because we can afford it and it's +EV
                                 my_actions[i] = CallAction()
                                 net_cost += board_cont_cost
@@ -489,7 +650,7 @@ class Player(Bot):
                         net_cost += 0
                 
                 else: # board_cont_cost == 0, we control the action
-                    if random.random() < 1.4 * strength and strength > _RAISE_MIN_STR[state_str]: # raise sometimes, more likely if our hand is strong
+                    if rng_random() < 1.4 * strength and strength > raise_min_str: # raise sometimes, more likely if our hand is strong
                         my_actions[i] = commit_action
                         net_cost += commit_cost
 
@@ -497,6 +658,7 @@ class Player(Bot):
                         my_actions[i] = CheckAction()
                         net_cost += 0
 
+        self._round_elapsed += time.perf_counter() - start_time
         return my_actions
 
 
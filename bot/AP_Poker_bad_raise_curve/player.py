@@ -8,9 +8,16 @@ from skeleton.bot import Bot
 from skeleton.runner import parse_args, run_bot
 
 import eval7
+import functools
+import itertools
+import numpy as np
 import random
-import pandas as pd
+import csv
 import math
+import multiprocessing
+import atexit
+import os
+import time
 
 NUMS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K']
 SUITS = ['s', 'c', 'd', 'h']
@@ -20,10 +27,295 @@ for i in range(13):
     for j in range(4):
         FULL_DECK.append(NUMS[i] + SUITS[j])
 
-_MONTE_CARLO_ITERS = 200
+CARD_OBJS = {card: eval7.Card(card) for card in FULL_DECK} # eval7 cards built once, not on every Monte Carlo iteration
+IDX_OF = {card: i for i, card in enumerate(FULL_DECK)} # position of every card in FULL_DECK
+EVAL7_BY_IDX = [CARD_OBJS[card] for card in FULL_DECK] # eval7 card for each deck index
+EVAL7_ARR = np.array(EVAL7_BY_IDX, dtype=object) # same, as a numpy array so whole draws convert in one go
+DECK_IDX = list(range(52)) # the whole deck as indices
+
+# eval7 ships its own Monte Carlo equity loop written in Cython (xorshift draws, C hand evaluator),
+# so a whole sim runs without coming back into python. Older eval7 builds may not have it.
+_C_HAND_VS_RANGE = getattr(eval7, 'py_hand_vs_range_monte_carlo', None)
+_C_HAND_VS_RANGE_EXACT = getattr(eval7, 'py_hand_vs_range_exact', None) # exact equity with the board as it is, only used on the river
+ANY_TWO = eval7.HandRange('22+,A2+,K2+,Q2+,J2+,T2+,92+,82+,72+,62+,52+,42+,32') # all 1326 opponent holes, equally likely
+# eval7's loop doesn't pick the opponent hole at random: iteration k plays the k-th hole (mod the count) that doesn't
+# clash with our cards, and only the board is random. A run shorter than that count only ever sees the first holes
+# in ANY_TWO (the pairs), so we always run a whole number of passes over them. Indexed by number of board cards.
+_OPP_HOLES = {street: math.comb(50 - street, 2) for street in (3, 4, 5)}
+
+# The Monte Carlo budget is counted in passes: one pass of the C loop plays every opponent hole once (_OPP_HOLES
+# iterations, well under 0.1 ms), one pass of the python fallback is _FALLBACK_PASS_ITERS iterations.
+_MC_PASSES = 1 # passes per board until we've timed our Monte Carlo
+_MIN_PASSES = 1 # bounds on the adaptive pass count, the clock decides in between
+_MAX_PASSES = 64 # about +-0.002 on the C loop's estimate, more won't change a decision
+_FALLBACK_PASS_ITERS = 200
+_EVALS_PER_ROUND = 9 # 3 boards x flop, turn and river
+_MC_CLOCK_SHARE = 0.5 # fraction of our remaining clock we're willing to spend on Monte Carlo
 _INTIMIDATION_THRESHOLD = 0
+_CHECK_EVERY = 25 # Monte Carlo iterations between early exit checks
+_MIN_SAMPLES = 100 # never exit before this many, a short lucky run can look settled
+_Z = 1.96 # 95% confidence
+_STRENGTH_BINS = 1000 # resolution of the raise table below
+
+# fraction of the pot we raise by, for each street and strength bin: sqrt(strength - 0.5), scaled by sqrt(street) after the flop
+RAISE_MULT = [[(math.sqrt(street) if street >= 3 else 1) * math.sqrt(max(0, b / _STRENGTH_BINS - 0.5)) for b in range(_STRENGTH_BINS + 1)] for street in range(6)]
+
+
+def _decided(score, n, threshold):
+    '''
+    True when a 95% Wilson interval around our win rate so far sits entirely
+    on one side of threshold, so more samples won't change the decision.
+
+    Arguments:
+    score: our score so far, 2 per win and 1 per tie
+    n: number of showdowns simulated so far
+    threshold: the raw win rate a call/fold decision flips at (pot odds, adjusted for intimidation)
+    '''
+    p_hat = score / (2 * n)
+    z2_n = _Z * _Z / n
+    center = (p_hat + z2_n / 2) / (1 + z2_n)
+    half = _Z * math.sqrt(p_hat * (1 - p_hat) / n + z2_n / (4 * n)) / (1 + z2_n)
+    return center - half > threshold or center + half < threshold
+
+
+def _mc_equity(priv_idx, pub_idx, deck_idx, iters, rng, threshold=None):
+    '''
+    The Monte Carlo loop of public_eval, pulled out to work on deck indices.
+    Every draw for every iteration comes out of a single numpy call, so the
+    python loop left over only looks up cards and evaluates.
+
+    Arguments:
+    priv_idx: list of our 2 hole card indices
+    pub_idx: list of the community card indices we can see
+    deck_idx: list of the indices of every card we can't see
+    iters: number of showdowns to simulate
+    rng: numpy Generator used for the draws
+    threshold: if given, stop early once our win rate is clearly above or below it
+
+    Returns:
+    Our score, 2 per win and 1 per tie, and the number of showdowns it took.
+    '''
+    _OPP = 2
+    n_draw = _OPP + 5 - len(pub_idx) # 2 cards for opp_hole, and 5 - street cards for hidden_public (depending on turn and river)
+
+    n_known = len(pub_idx)
+
+    # one row per iteration: the columns of the n_draw smallest random keys are a draw without replacement
+    picks = rng.random((iters, len(deck_idx))).argpartition(n_draw, axis=1)[:, :n_draw]
+    draws = EVAL7_ARR[np.array(deck_idx)[picks]].tolist() # straight to eval7 cards, opp_hole first then hidden_public
+
+    # two 7 card buffers, the known cards go in once and each iteration only overwrites the drawn slots
+    my_hand = [EVAL7_BY_IDX[i] for i in priv_idx + pub_idx] + [None] * (n_draw - _OPP)
+    opp_hand = [EVAL7_BY_IDX[i] for i in pub_idx] + [None] * n_draw
+
+    evaluate = eval7.evaluate
+    score = 0
+    n = 0
+    while n < iters:
+        for draw in draws[n:n + _CHECK_EVERY]:
+            opp_hand[n_known:] = draw
+            my_hand[_OPP + n_known:] = draw[_OPP:]
+
+            my_strength = evaluate(my_hand)
+            opp_strength = evaluate(opp_hand)
+
+            score += (my_strength > opp_strength) + (my_strength >= opp_strength) # 2 for a win, 1 for a tie
+        n = min(n + _CHECK_EVERY, iters)
+
+        if threshold is not None and n >= _MIN_SAMPLES and _decided(score, n, threshold): # lopsided spot, the answer won't flip
+            break
+
+    return score, n
+
+
+def _river_equity(priv_idx, pub_idx, deck_idx):
+    '''
+    Exact equity on the river: the board is complete, so we score our hand
+    once and compare it against every hole the opponent could hold.
+
+    Arguments:
+    priv_idx: list of our 2 hole card indices
+    pub_idx: list of the 5 community card indices
+    deck_idx: list of the indices of every card we can't see
+
+    Returns:
+    Our score, 2 per win and 1 per tie, and the number of opponent holes checked.
+    '''
+    board = [EVAL7_BY_IDX[i] for i in pub_idx]
+    my_strength = eval7.evaluate([EVAL7_BY_IDX[i] for i in priv_idx] + board)
+
+    evaluate = eval7.evaluate
+    opp_hand = [None, None] + board
+    score = 0
+    holes = 0
+    for opp_1, opp_2 in itertools.combinations([EVAL7_BY_IDX[i] for i in deck_idx], 2):
+        opp_hand[0] = opp_1
+        opp_hand[1] = opp_2
+        opp_strength = evaluate(opp_hand)
+        score += (my_strength > opp_strength) + (my_strength >= opp_strength) # 2 for a win, 1 for a tie
+        holes += 1
+
+    return score, holes
+
+
+_NP_RNG = np.random.default_rng() # random draws for the python Monte Carlo fallback
+
+def canonical_spot(priv_idx, pub_idx):
+    '''
+    Relabels the suits of a spot in order of first appearance (our hole, then the board),
+    with both card groups sorted. Equity doesn't care which suit is which, so spots that
+    only differ by a suit swap or card order get the same key.
+
+    Arguments:
+    priv_idx: our 2 hole cards as deck indices
+    pub_idx: the community cards we can see, as deck indices
+
+    Returns:
+    The relabelled hole and board, as sorted tuples of deck indices.
+    '''
+    suit_map = {}
+    canonical = []
+    for cards in (sorted(priv_idx), sorted(pub_idx)):
+        relabelled = []
+        for card in cards:
+            suit = card & 3 # FULL_DECK index is rank * 4 + suit
+            if suit not in suit_map:
+                suit_map[suit] = len(suit_map)
+            relabelled.append(card - suit + suit_map[suit])
+        canonical.append(tuple(sorted(relabelled)))
+    return canonical[0], canonical[1]
+
+
+@functools.lru_cache(maxsize=4096)
+def _spot_equity(priv_idx, pub_idx, passes, threshold):
+    '''
+    Equity of a canonical spot, memoised so repeat decisions on the same
+    board (our opponent re-raising, say) don't rerun the Monte Carlo.
+
+    Arguments:
+    priv_idx: tuple of our 2 hole card indices, from canonical_spot
+    pub_idx: tuple of the visible community card indices, from canonical_spot
+    passes: number of Monte Carlo passes, see _MC_PASSES
+    threshold: the decision threshold for the python loop's early exit, or None
+
+    Returns:
+    Our strength, and how many passes that was actually worth.
+    '''
+    river = len(pub_idx) == 5 # nothing left to come, so we can check every opponent hole instead of sampling
+
+    if river and _C_HAND_VS_RANGE_EXACT is not None and _C_HAND_VS_RANGE is not None: # every opponent hole once, in C
+        return _C_HAND_VS_RANGE_EXACT([EVAL7_BY_IDX[card] for card in priv_idx], ANY_TWO, [EVAL7_BY_IDX[card] for card in pub_idx]), 0 # no sampling, and only a fraction of a pass's time
+
+    if _C_HAND_VS_RANGE is not None: # whole sim in C, opponent holes that clash with our cards are skipped for us
+        iters = passes * _OPP_HOLES[len(pub_idx)] # whole passes, every opponent hole gets the same number of boards
+        return _C_HAND_VS_RANGE([EVAL7_BY_IDX[card] for card in priv_idx], ANY_TWO, [EVAL7_BY_IDX[card] for card in pub_idx], iters), passes # no early exit, a call is mostly fixed overhead
+
+    priv_idx = list(priv_idx) # fall back to our own python loop
+    pub_idx = list(pub_idx)
+    deck_idx = DECK_IDX[:] # local copies, the module lists stay in deck order
+    slot = DECK_IDX[:] # slot[card] is where that card currently sits in deck_idx
+    end = 52
+    for card in priv_idx + pub_idx: # swap every card we can see to the tail, no hashing
+        end -= 1
+        tail_card = deck_idx[end]
+        deck_idx[slot[card]], deck_idx[end] = tail_card, card
+        slot[tail_card], slot[card] = slot[card], end
+    deck_idx = deck_idx[:end] # every card we can't see, as deck indices
+
+    if river:
+        score, holes = _river_equity(priv_idx, pub_idx, deck_idx)
+        return score/(2 * holes), holes / (2 * _FALLBACK_PASS_ITERS) # one evaluation per hole, a Monte Carlo iteration is two
+
+    score, iters = _mc_equity(priv_idx, pub_idx, deck_idx, passes * _FALLBACK_PASS_ITERS, _NP_RNG, threshold)
+
+    return score/(2 * iters), iters / _FALLBACK_PASS_ITERS
+
+
+_CACHE_ROUND = None # the round _spot_equity's cache holds spots from, per process
+
+def public_eval(private, public, street, passes, threshold=None, round_num=None):
+    """
+    evaluate current combined hand with hole + community cards, then calculate pot odds by running through all other cards.
+    Lives at module level so the process pool can pickle it.
+
+    params: list of our 2 hole cards as deck indices, tuple of public_cards, optional win rate the decision hinges on (lets the python loop stop early),
+    the round we're in (a new one clears the equity cache, in the player and in every pool worker since each keeps its own)
+    returns: our strength, and how many Monte Carlo passes were actually run (0 if we'd seen the spot before)
+    """
+    global _CACHE_ROUND
+    if round_num != _CACHE_ROUND: # new cards, old spots won't come up again
+        _spot_equity.cache_clear()
+        _CACHE_ROUND = round_num
+
+    priv_idx, pub_idx = canonical_spot(private, [IDX_OF[card] for card in public])
+    if _C_HAND_VS_RANGE is not None: # the C loop never stops early, so the threshold would only split the cache
+        threshold = None
+
+    hits = _spot_equity.cache_info().hits
+    strength, passes_run = _spot_equity(priv_idx, pub_idx, passes, threshold)
+    if _spot_equity.cache_info().hits > hits: # answered from the cache, no Monte Carlo ran
+        passes_run = 0
+
+    return strength, passes_run
+
+
+def _seed_worker():
+    '''
+    Pool initializer. Forked workers start with copies of the parent's random
+    state, so without this all three boards would be simulated with the same draws.
+    '''
+    global _NP_RNG
+    seed = os.getpid() ^ time.time_ns()
+    _NP_RNG = np.random.default_rng(seed)
+    if _C_HAND_VS_RANGE is not None:
+        eval7.xorshift_rand.seed(seed & 0xFFFFFFFF)
+
+
+_POOL = None
+
+def get_pool():
+    '''
+    Returns the process pool we run per-board Monte Carlo on, creating it the first
+    time. Only the python fallback is slow enough to be worth shipping to other cores:
+    with eval7's C loop a board takes well under a millisecond, about what a pool round
+    trip costs. Returns None then, and on a single core machine.
+    '''
+    global _POOL
+    if _POOL is None and _C_HAND_VS_RANGE is None and (os.cpu_count() or 1) > 1:
+        _POOL = multiprocessing.Pool(NUM_BOARDS, initializer=_seed_worker)
+        atexit.register(_POOL.terminate) # shut the workers down ourselves, leaving it to Pool.__del__ at exit throws
+    return _POOL
+
 
 RANK_DICT = {'2':2, '3':3, '4':4, '5':5, '6':6, '7':7, '8':8, '9':9, 'T':10, 'J':11, 'Q':12, 'K':13, 'A':14}
+RANK_IDX = {rank: RANK_DICT[rank] - 2 for rank in RANK_DICT} # 0 for '2' up to 12 for 'A'
+CARD_RANK = {card: RANK_DICT[card[0]] for card in FULL_DECK} # numeric rank of every card string, our sort key
+
+def _hole_key(idx_high, idx_low, suited):
+    '''
+    Packs a hole into a small int (0 - 337), its slot in our strength array,
+    so lookups don't have to build strings.
+
+    idx_high, idx_low: int - the two ranks as RANK_IDX values, higher first
+    suited: bool - whether the two cards share a suit
+    '''
+    return ((idx_high * 13 + idx_low) << 1) | suited
+
+def load_strengths(path):
+    '''
+    Reads the hole strengths we computed offline into an array indexed by _hole_key.
+
+    Arguments:
+    path: the csv written by compute.py, with Holes and Strengths columns
+    '''
+    strengths = np.zeros(338) # one slot per hole key, O(1) lookup time without hashing!
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f): # 169 rows, the csv module is plenty and saves importing pandas
+            hole = row['Holes']
+            strengths[_hole_key(RANK_IDX[hole[0]], RANK_IDX[hole[1]], hole[2] == 's')] = float(row['Strengths'])
+    return strengths
+
+STARTING_STRENGTHS = load_strengths(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hole_strengths.csv'))
 
 class Player(Bot):
     '''
@@ -40,25 +332,13 @@ class Player(Bot):
         Returns:
         Nothing.
         ''' 
-        self.board_allocations = [[], [], []] # keep track of our allocations at round start
-        self.hole_strengths = [0, 0, 0] # better representation of our hole strengths per round (win probability!)
-
-        # make sure this df isn't too big!! Loading data all at once might be slow if you did more computations!
-        calculated_df = pd.read_csv('hole_strengths.csv') # the values we computed offline, this df is slow to search through though
-        holes = calculated_df.Holes # the columns of our spreadsheet
-        strengths = calculated_df.Strengths
-        self.starting_strengths = dict(zip(holes, strengths)) # convert to a dictionary, O(1) lookup time!
-
-
-    def rank_to_numeric(self, rank):
-        '''
-        Method that converts our given rank as a string
-        into an integer ranking
-
-        rank: str - one of 'A, K, Q, J, T, 9, 8, 7, 6, 5, 4, 3, 2'
-        '''
-
-        return RANK_DICT[rank]
+        self.board_allocations = np.zeros((NUM_BOARDS, 2), dtype=np.int8) # keep track of our allocations at round start, as deck indices
+        self.hole_strengths = np.zeros(NUM_BOARDS) # better representation of our hole strengths per round (win probability!)
+        self._pass_budget = _MC_PASSES # Monte Carlo passes per board this round
+        self._mc_seconds = 0.0 # total time spent on Monte Carlo so far, and how many passes it bought
+        self._mc_passes = 0
+        self.starting_strengths = STARTING_STRENGTHS # the values we computed offline, loaded once at import
+        self.pool = get_pool() # fork our Monte Carlo workers now, before run_bot connects and before the game clock runs
 
 
     def sort_cards_by_rank(self, cards):
@@ -68,13 +348,13 @@ class Player(Bot):
 
         cards: list - a list of card strings in the engine's format (Kd, As, Th, 7d, etc.)
         '''
-        return sorted(cards, reverse=True, key=lambda x: self.rank_to_numeric(x[0])) # we want it in descending order
+        return sorted(cards, reverse=True, key=CARD_RANK.__getitem__) # we want it in descending order, one C-level dict lookup per card
 
 
     def hole_list_to_key(self, hole):
         '''
-        Converts a hole card list into a key that we can use to query our 
-        strength dictionary
+        Converts a hole card list into a key that we can use to index our 
+        strength array
 
         hole: list - A list of two card strings in the engine's format (Kd, As, Th, 7d, etc.)
         '''
@@ -84,15 +364,14 @@ class Player(Bot):
         rank_1, suit_1 = card_1[0], card_1[1] # card info
         rank_2, suit_2 = card_2[0], card_2[1]
 
-        numeric_1, numeric_2 = self.rank_to_numeric(rank_1), self.rank_to_numeric(rank_2) # make numeric
+        numeric_1, numeric_2 = RANK_IDX[rank_1], RANK_IDX[rank_2] # make numeric
 
         suited = suit_1 == suit_2 # off-suit or not
-        suit_string = 's' if suited else 'o'
 
         if numeric_1 >= numeric_2: # keep our hole cards in rank order
-            return rank_1 + rank_2 + suit_string
+            return _hole_key(numeric_1, numeric_2, suited)
         else:
-            return rank_2 + rank_1 + suit_string
+            return _hole_key(numeric_2, numeric_1, suited)
 
 
     def allocate_cards(self, my_cards):
@@ -106,58 +385,18 @@ class Player(Bot):
         my_cards: a list of the 6 cards given to us at round start
         '''
         my_cards = self.sort_cards_by_rank(my_cards)
-        holes_allocated = []
-        for k in range(3):
-            max_strength_hole = 0
-            temp_cards = []
-
-            for i in range(len(my_cards)-1):
-                for j in range(i+1, len(my_cards)):
-                    hole_list = [my_cards[i], my_cards[j]]
-                    temp_hole = self.hole_list_to_key(hole_list)
-                    strength = self.starting_strengths[temp_hole]
-
-                    if strength > max_strength_hole:
-                        temp_cards = hole_list
-                        max_strength_hole = strength
-
-            self.board_allocations[2-k] = temp_cards
-            self.hole_strengths[2-k] = max_strength_hole
-            my_cards.remove(temp_cards[0]) 
-            my_cards.remove(temp_cards[1])
-            
-
-    def public_eval(self, private, public, street, iters):
-        """
-        evaluate current combined hand with hole + community cards, then calculate pot odds by running through all other cards
-
-        params: tuple of private_cards, tuple of public_cards
-        """
+        n = len(my_cards)
 
-        _PUB = 5 - street # number of public cards to be drawn (turn/river)
-        _OPP = 2
-        score = 0
-
-        remaining_cards = set(FULL_DECK)
-        remaining_cards -= set(private)
-        remaining_cards -= set(public)
-        
-        for _ in range(iters):
-            draw = random.sample(remaining_cards, _OPP + _PUB) # pull 2 cards for opp_hole, and 5 - street cards for hidden_public (depending on turn and river)
-            opp_hole = draw[:_OPP]
-            hidden_public = draw[_OPP:]
-
-            my_strength = eval7.evaluate([eval7.Card(card) for card in tuple(private + public + hidden_public)])
-            opp_strength = eval7.evaluate([eval7.Card(card) for card in tuple(opp_hole + public + hidden_public)])
-
-            if my_strength > opp_strength:
-                score += 2
-            elif my_strength == opp_strength:
-                score += 1
-            else:
-                pass
+        pair_strengths = np.full((n, n), -np.inf) # strength of every pair (i < j) of our cards, looked up once
+        for i in range(n-1):
+            for j in range(i+1, n):
+                pair_strengths[i, j] = self.starting_strengths[self.hole_list_to_key([my_cards[i], my_cards[j]])]
 
-        return score/(2 * iters)
+        for k in range(3):
+            i, j = divmod(int(pair_strengths.argmax()), n) # strongest pair left, ties go to the first one like before
+            self.board_allocations[2-k] = IDX_OF[my_cards[i]], IDX_OF[my_cards[j]]
+            self.hole_strengths[2-k] = pair_strengths[i, j]
+            pair_strengths[i] = pair_strengths[j] = pair_strengths[:, i] = pair_strengths[:, j] = -np.inf # those two cards are used up, plain slices so numpy doesn't build index arrays
 
 
     def handle_new_round(self, game_state, round_state, active):
@@ -181,6 +420,12 @@ class Player(Bot):
 
         self.allocate_cards(my_cards)
 
+        if self._mc_seconds > 0: # split what's left of the clock over the rounds to come
+            rate = self._mc_passes / self._mc_seconds # passes we get through per second
+            rounds_left = max(1, NUM_ROUNDS - round_num + 1)
+            budget = game_clock / rounds_left * _MC_CLOCK_SHARE * rate / _EVALS_PER_ROUND
+            self._pass_budget = int(min(max(budget, _MIN_PASSES), _MAX_PASSES))
+
 
     def handle_round_over(self, game_state, terminal_state, active):
         '''
@@ -203,8 +448,8 @@ class Player(Bot):
             my_cards = previous_board_state.hands[active] # your cards
             opp_cards = previous_board_state.hands[1-active] # opponent's cards or [] if not revealed
         
-        self.board_allocations = [[], [], []] # reset our variables at the end of every round!
-        self.hole_strengths = [0, 0, 0]
+        self.board_allocations.fill(0) # reset our variables at the end of every round!
+        self.hole_strengths.fill(0)
         self.last_seen_street = 0
 
         game_clock = game_state.game_clock # check how much time we have remaining at the end of a game
@@ -229,9 +474,16 @@ class Player(Bot):
         legal_actions = round_state.legal_actions() # the actions you are allowed to take
         street = round_state.street # 0, 3, 4, or 5 representing pre-flop, flop, turn, or river respectively
         my_cards = round_state.hands[active] # your cards across all boards
-        board_cards = [board_state.deck if isinstance(board_state, BoardState) else board_state.previous_state.deck for board_state in round_state.board_states] # the board cards
-        my_pips = [board_state.pips[active] if isinstance(board_state, BoardState) else 0 for board_state in round_state.board_states] # the number of chips you have contributed to the pot on each board this round of betting
-        opp_pips = [board_state.pips[1-active] if isinstance(board_state, BoardState) else 0 for board_state in round_state.board_states] # the number of chips your opponent has contributed to the pot on each board this round of betting
+        board_cards = [None] * NUM_BOARDS # the board cards
+        my_pips = [0] * NUM_BOARDS # the number of chips you have contributed to the pot on each board this round of betting
+        opp_pips = [0] * NUM_BOARDS # the number of chips your opponent has contributed to the pot on each board this round of betting
+        for i, board_state in enumerate(round_state.board_states): # one type check per board fills all three
+            if isinstance(board_state, BoardState):
+                board_cards[i] = board_state.deck
+                my_pips[i] = board_state.pips[active]
+                opp_pips[i] = board_state.pips[1-active]
+            else:
+                board_cards[i] = board_state.previous_state.deck
         continue_cost = [opp_pips[i] - my_pips[i] for i in range(NUM_BOARDS)] # the number of chips needed to stay in each board's pot
         my_stack = round_state.stacks[active] # the number of chips you have remaining
         opp_stack = round_state.stacks[1-active] # the number of chips your opponent has remaining
@@ -239,11 +491,32 @@ class Player(Bot):
         net_upper_raise_bound = round_state.raise_bounds()[1] # max raise across 3 boards
         net_cost = 0 # keep track of the net additional amount you are spending across boards this round
 
+        strengths = [None] * NUM_BOARDS # post-flop equity per board, worked out before we bet
+        if street >= 3:
+            jobs = []
+            for i in range(NUM_BOARDS):
+                if AssignAction not in legal_actions[i] and not isinstance(round_state.board_states[i], TerminalState):
+                    board_cont_cost = continue_cost[i]
+                    threshold = None # raise sizing scales with the equity itself, so only a plain call or fold can stop early
+                    if board_cont_cost > 0 and RaiseAction not in legal_actions[i]:
+                        pot_odds = board_cont_cost / (my_pips[i] + opp_pips[i] + round_state.board_states[i].pot + board_cont_cost)
+                        k = 0.05 * math.sqrt(max(0, board_cont_cost - _INTIMIDATION_THRESHOLD)) # below we call when strength - k * sqrt(strength) >= pot_odds,
+                        threshold = ((k + math.sqrt(k * k + 4 * pot_odds)) / 2) ** 2 # which is strength >= this
+                    jobs.append((i, (self.board_allocations[i].tolist(), board_cards[i][:street], street, self._pass_budget, threshold, game_state.round_num)))
+            start = time.perf_counter()
+            if self.pool is not None and len(jobs) >= 2: # worth shipping out to the other cores
+                results = self.pool.starmap(public_eval, [job for _, job in jobs])
+            else:
+                results = [public_eval(*job) for _, job in jobs]
+            for (i, _), (strength, passes_run) in zip(jobs, results):
+                strengths[i] = strength
+                self._mc_passes += passes_run
+            self._mc_seconds += time.perf_counter() - start
+
         my_actions = [None] * NUM_BOARDS
         for i in range(NUM_BOARDS):
-            cards = self.board_allocations[i] # assign our cards that we made earlier
             if AssignAction in legal_actions[i]:
-                my_actions[i] = AssignAction(cards) # add to our actions
+                my_actions[i] = AssignAction([FULL_DECK[card] for card in self.board_allocations[i]]) # assign our cards that we made earlier
                 
             elif isinstance(round_state.board_states[i], TerminalState): # make sure the game isn't over at this board
                 my_actions[i] = CheckAction() # check if it is
@@ -256,14 +529,14 @@ class Player(Bot):
 
                 if street < 3: # pre-flop
                     strength = self.hole_strengths[i] # pull from hole_strengths.csv
-                    if self.starting_strengths[self.hole_list_to_key(cards)] > 0.5:
-                        raise_amount = int(my_pips[i] + board_cont_cost + math.sqrt(strength - 0.5) * (pot_total + board_cont_cost)) # play conservative pre-flop
+                    if strength > 0.5: # allocate_cards already looked this hole up
+                        raise_amount = int(my_pips[i] + board_cont_cost + RAISE_MULT[0][int(strength * _STRENGTH_BINS)] * (pot_total + board_cont_cost)) # play conservative pre-flop
                     else: 
                         raise_amount = 0 # min_raise
                 else:
-                    strength = self.public_eval(cards, board_cards[i][:street], street, _MONTE_CARLO_ITERS) # run Monte Carlo sims to estimate str of hand
+                    strength = strengths[i] # Monte Carlo estimate of our hand strength from above
                     if strength > 0.5:
-                        raise_amount = int(my_pips[i] + board_cont_cost + math.sqrt(street) * math.sqrt(strength - 0.5) * (pot_total + board_cont_cost)) # raise the stakes deeper into the game
+                        raise_amount = int(my_pips[i] + board_cont_cost + RAISE_MULT[street][int(strength * _STRENGTH_BINS)] * (pot_total + board_cont_cost)) # raise the stakes deeper into the game
                     else:
                         raise_amount = 0 # min_raise
 
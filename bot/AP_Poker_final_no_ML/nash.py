@@ -1,5 +1,11 @@
-import eval7
-import random
+'''
+Offline experiment: deal random 6 card hands, allocate them like player.py does,
+and report the average starting strength we end up with on each board.
+Run from this folder: python3 nash.py
+'''
+import csv
+import numpy as np
+
 NUMS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K']
 SUITS = ['s', 'c', 'd', 'h']
 FULL_DECK = []
@@ -7,99 +13,105 @@ FULL_DECK = []
 for i in range(13):
     for j in range(4):
         FULL_DECK.append(NUMS[i] + SUITS[j])
-calculated_df = pd.read_csv('hole_strengths.csv') # the values we computed offline, this df is slow to search through though
-holes = calculated_df.Holes # the columns of our spreadsheet
-strengths = calculated_df.Strengths
-starting_strengths = dict(zip(holes, strengths))
-def hole_list_to_key(self, hole):
-        '''
-    Converts a hole card list into a key that we can use to query our 
-    strength dictionary
-
-    hole: list - A list of two card strings in the engine's format (Kd, As, Th, 7d, etc.)
+
+RANK_DICT = {'2':2, '3':3, '4':4, '5':5, '6':6, '7':7, '8':8, '9':9, 'T':10, 'J':11, 'Q':12, 'K':13, 'A':14}
+RANK_IDX = {rank: RANK_DICT[rank] - 2 for rank in RANK_DICT} # 0 for '2' up to 12 for 'A'
+
+CARD_RANK = [RANK_IDX[card[0]] for card in FULL_DECK] # rank of every deck index
+CARD_SUIT = [SUITS.index(card[1]) for card in FULL_DECK] # suit of every deck index
+
+_TRIALS = 10000
+
+
+def hole_key(idx_high, idx_low, suited):
+    '''
+    Packs a hole into a small int (0 - 337), its slot in our strength array.
+
+    idx_high, idx_low: int - the two ranks as RANK_IDX values, higher first
+    suited: bool - whether the two cards share a suit
     '''
-    card_1 = hole[0] # get all of our relevant info
-    card_2 = hole[1]
+    return ((idx_high * 13 + idx_low) << 1) | suited
 
-    rank_1, suit_1 = card_1[0], card_1[1] # card info
-    rank_2, suit_2 = card_2[0], card_2[1]
 
-    numeric_1, numeric_2 = self.rank_to_numeric(rank_1), self.rank_to_numeric(rank_2) # make numeric
+def load_strengths(path):
+    '''
+    Reads the hole strengths compute.py wrote into an array indexed by hole_key.
+
+    path: the csv with Holes and Strengths columns
+    '''
+    strengths = np.zeros(338)
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            hole = row['Holes']
+            strengths[hole_key(RANK_IDX[hole[0]], RANK_IDX[hole[1]], hole[2] == 's')] = float(row['Strengths'])
+    return strengths
+
+starting_strengths = load_strengths('hole_strengths.csv')
 
-    suited = suit_1 == suit_2 # off-suit or not
-    suit_string = 's' if suited else 'o'
 
-    if numeric_1 >= numeric_2: # keep our hole cards in rank order
-        return rank_1 + rank_2 + suit_string
+def hole_list_to_key(hole):
+    '''
+    Converts a hole (two deck indices) into its key in starting_strengths
+
+    hole: list - two indices into FULL_DECK
+    '''
+    rank_1, rank_2 = CARD_RANK[hole[0]], CARD_RANK[hole[1]]
+    suited = CARD_SUIT[hole[0]] == CARD_SUIT[hole[1]] # off-suit or not
+
+    if rank_1 >= rank_2: # keep our hole cards in rank order
+        return hole_key(rank_1, rank_2, suited)
     else:
-        return rank_2 + rank_1 + suit_string
-def rank_to_numeric(self, rank):
-        '''
-        Method that converts our given rank as a string
-        into an integer ranking
-
-        rank: str - one of 'A, K, Q, J, T, 9, 8, 7, 6, 5, 4, 3, 2'
-        '''
-    if rank.isnumeric(): # 2-9, we can just use the int version of this string
-        return int(rank)
-    elif rank == 'T': # 10 is T, so we need to specify it here
-        return 10
-    elif rank == 'J': # Face cards for the rest of them
-        return 11
-    elif rank == 'Q':
-        return 12
-    elif rank == 'K':
-        return 13
-    else: # Ace (A) is the only one left, give it the highest rank
-        return 14
-def sort_cards_by_rank(self, cards):
+        return hole_key(rank_2, rank_1, suited)
+
+
+def sort_cards_by_rank(cards):
     '''
-    Method that takes in a list of cards in the engine's format
-    and sorts them by rank order
+    Sorts a list of deck indices by rank, highest first
 
-    cards: list - a list of card strings in the engine's format (Kd, As, Th, 7d, etc.)
+    cards: list - indices into FULL_DECK
     '''
-    return sorted(cards, reverse=True, key=lambda x: self.rank_to_numeric(x[0])) 
-def allocate_cards(self, my_cards):
-        '''
-        Method that allocates our cards at the beginning of a round. Method
-        modifies self.board_allocations. The method attempts to make pairs
-        by allocating hole cards that share a rank if possible. The exact
-        stack these cards are allocated to is not defined.
-
-        Arguments:
-        my_cards: a list of the 6 cards given to us at round start
-        '''
-    my_cards = self.sort_cards_by_rank(my_cards)
-    holes_allocated = []
-    for _ in range(3):
-        max_strength_hole = 0
-        temp_cards = []
+    return sorted(cards, reverse=True, key=CARD_RANK.__getitem__)
 
-        for i in range(len(my_cards)-1):
-            for j in range(i+1, len(my_cards)):
-                hole_list = [my_cards[i], my_cards[j]]
-                temp_hole = self.hole_list_to_key(hole_list)
-                strength = self.starting_strengths[temp_hole]
 
-                if strength > max_strength_hole:
-                    temp_cards = hole_list
-                    max_strength_hole = strength
+def allocate_cards(my_cards):
+    '''
+    Allocates 6 cards into 3 holes the same way player.py does: score all
+    15 pairs once, then take the strongest pair left three times.
+
+    Arguments:
+    my_cards: a list of the 6 deck indices we were dealt
+
+    Returns:
+    The three holes, strongest first.
+    '''
+    my_cards = sort_cards_by_rank(my_cards)
+    n = len(my_cards)
 
-        holes_allocated.append(temp_cards)
-        my_cards.remove(temp_cards[0]) 
-        my_cards.remove(temp_cards[1])
+    pair_strengths = np.full((n, n), -np.inf) # strength of every pair (i < j), looked up once
+    for i in range(n-1):
+        for j in range(i+1, n):
+            pair_strengths[i, j] = starting_strengths[hole_list_to_key([my_cards[i], my_cards[j]])]
+
+    holes_allocated = []
+    for _ in range(3):
+        i, j = divmod(int(pair_strengths.argmax()), n) # strongest pair left, ties go to the first one
+        holes_allocated.append([my_cards[i], my_cards[j]])
+        pair_strengths[i] = pair_strengths[j] = pair_strengths[:, i] = pair_strengths[:, j] = -np.inf # those two cards are used up
 
     return holes_allocated # return our decisions
+
+
 if  __name__ == "__main__":
-    strength1, strength2. strength3 = 0, 0, 0
-    for i in range (10000):
-        cards = random.sample(FULL_DECK, 6))
+    rng = np.random.default_rng()
+    hands = rng.permuted(np.tile(np.arange(52), (_TRIALS, 1)), axis=1)[:, :6].tolist() # every trial's 6 cards in one go
+
+    strength1, strength2, strength3 = 0, 0, 0
+    for cards in hands:
         holelist = allocate_cards(cards)
         strength1 += starting_strengths[hole_list_to_key(holelist[2])]
         strength2 += starting_strengths[hole_list_to_key(holelist[1])]
         strength3 += starting_strengths[hole_list_to_key(holelist[0])]
-    
-    print(strength1/10000)
-    print(strength2/10000)
-    print(strength3/10000)
\ No newline at end of file
+
+    print(strength1/_TRIALS)
+    print(strength2/_TRIALS)
+    print(strength3/_TRIALS)
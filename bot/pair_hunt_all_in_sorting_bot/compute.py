@@ -0,0 +1,97 @@
+'''
+Builds player.py's PREFLOP_EQUITY_169 chart offline. Run from this folder: python3 compute.py
+and paste what it prints over the chart in player.py.
+'''
+import eval7
+import math
+import numpy as np
+
+_RANKS = 'AKQJT98765432'
+
+_MIN_SAMPLES = 100 # Monte Carlo early stopping: never trust fewer samples than this, a short lucky run looks like zero variance
+_CHECK_EVERY = 10 # how often we check whether to stop
+_TOLERANCE = 0.001 # python fallback: stop once the 95% confidence half-width on the strength is below this, after about 800k samples
+_Z = 1.96
+_BATCH = 10000 # samples drawn per numpy call, a whole run at once wouldn't fit in memory
+
+# eval7 ships a whole Monte Carlo loop in Cython (xorshift draws, C evaluator), so a hole's simulation
+# never comes back into python. Its opponent holes aren't random though: sample k plays the k-th hole in
+# the range (mod the count) that doesn't clash with ours, only the board is random. So we always run whole
+# passes over the _OPP_HOLES holes left, or a short run would only ever face the pairs at the front of ANY_TWO.
+_C_HAND_VS_RANGE = getattr(eval7, 'py_hand_vs_range_monte_carlo', None) # older eval7 builds don't have it
+ANY_TWO = eval7.HandRange('22+,A2+,K2+,Q2+,J2+,T2+,92+,82+,72+,62+,52+,42+,32') # all 1326 opponent holes, equally likely
+_OPP_HOLES = 1225 # C(50, 2) opponent holes once our two cards are out
+
+_BASE_DECK = eval7.Deck().cards[:] # all 52 card objects, built once for every simulation
+_CARD_OBJ = {str(card): card for card in _BASE_DECK} # card string -> card object
+_RNG = np.random.default_rng() # numpy random state for drawing whole batches of samples
+
+
+def calculate_strength(hole, iters):
+    '''
+    A Monte Carlo method meant to estimate the win probability of a pair of
+    hole cards. Simlulates 'iters' games and determines the win rates of our cards
+
+    Arguments:
+    hole: a list of our two hole cards
+    iters: a integer that determines how many Monte Carlo samples to take
+
+    Returns: win probability, expressed as a float between 0 and 1
+    '''
+    hole_cards = [_CARD_OBJ[card] for card in hole] # card objects, used to evaliate hands
+
+    if _C_HAND_VS_RANGE is not None: # the whole simulation in C
+        passes = -(-iters // _OPP_HOLES)
+        return _C_HAND_VS_RANGE(hole_cards, ANY_TWO, [], passes * _OPP_HOLES)
+
+    hole_set = set(hole_cards)
+    deck_cards = np.array([card for card in _BASE_DECK if card not in hole_set], dtype=object) # remove cards that we know about! they shouldn't come up in simulations
+
+    score = 0
+    score_sq = 0 # sum of squared sample scores, for the variance
+    n = 0
+
+    _COMM = 5 # the number of cards we need to draw
+    _OPP = 2
+    _DRAW = _COMM + _OPP
+
+    evaluate = eval7.evaluate # local name, we call it twice a sample
+    our_hand = hole_cards + [None] * _COMM # the two showdown hands, filled in place each sample
+    opp_hand = [None] * (_OPP + _COMM)
+
+    while n < iters: # take 'iters' samples
+        # a batch of samples' 7 cards in one numpy call: in each row, the positions of the 7 smallest random keys are a draw without replacement
+        picks = _RNG.random((min(_BATCH, iters - n), len(deck_cards))).argpartition(_DRAW, axis=1)[:, :_DRAW]
+
+        for draw in deck_cards[picks].tolist():
+            opp_hand[:] = draw # opponent's hole then the community cards
+            our_hand[_OPP: ] = draw[_OPP: ]
+
+            d = evaluate(our_hand) - evaluate(opp_hand) # hand ranks are only useful for comparisons
+            sample = (d > 0) + (d >= 0) # 2 if we win, 1 if we tie, 0 if we lost
+            score += sample
+            score_sq += sample * sample
+
+            n += 1
+            if n >= _MIN_SAMPLES and n % _CHECK_EVERY == 0: # is our estimate already tight enough?
+                mean = score / n
+                variance = score_sq / n - mean * mean
+                if _Z * math.sqrt(variance / n) / 2 < _TOLERANCE: # 95% of the time we're within _TOLERANCE of the true strength
+                    return score / (2 * n)
+
+    return score / (2 * n) # this is our win probability!
+
+
+if __name__ == '__main__':
+
+    _MONTE_CARLO_ITERS = 2000 * _OPP_HOLES # 2.45M samples, a 95% half-width of about +-0.0006
+
+    print('PREFLOP_EQUITY_169 = {')
+    for i, high in enumerate(_RANKS): # one line of pairs and suited holes, then one of off-suit holes, per high card
+        lows = _RANKS[i+1:]
+        suited = [(high + high, [high + 's', high + 'h'])] + [(high + low + 's', [high + 's', low + 's']) for low in lows]
+        off_suit = [(high + low + 'o', [high + 's', low + 'h']) for low in lows]
+        for line in (suited, off_suit):
+            if line:
+                print('    ' + ', '.join("'%s': %.4f" % (key, calculate_strength(hole, _MONTE_CARLO_ITERS)) for key, hole in line) + ',')
+    print('}')
@@ -7,9 +7,49 @@ from skeleton.states import NUM_ROUNDS, STARTING_STACK, BIG_BLIND, SMALL_BLIND,
 from skeleton.bot import Bot
 from skeleton.runner import parse_args, run_bot
 
-import eval7
+import itertools
 import random
 
+_RANK = {rank: i for i, rank in enumerate('23456789TJQKA', start=2)} # numeric rank of each rank character, 2 up to 14 for an ace
+_CODE = {r + s: (i << 2) | j for i, r in enumerate('23456789TJQKA') for j, s in enumerate('shdc')} # card -> rank<<2 | suit, a small int, for all 52 cards
+_BITS = [bin(mask).count('1') for mask in range(16)] # popcount of a 4 bit suit mask
+
+# Board order for our holes, as indices into them sorted weakest first. Same odds as the old two swaps:
+# 15% swap the strongest with the middle hole, then 15% swap whatever is in the middle with the weakest.
+_PERMS = [(0, 1, 2), (0, 2, 1), (1, 0, 2), (2, 0, 1)]
+_PERM_CUM_WEIGHTS = [0.7225, 0.85, 0.9775, 1.0] # 0.85*0.85, then 0.15*0.85 twice, then 0.15*0.15
+
+# Preflop win probability (ties count half) of every hole against a random opponent hole, one entry per
+# pair / suited / offsuit combo. Worked out offline by compute.py with eval7's Monte Carlo, 2000 passes over the
+# opponent holes (2.45M samples, within about +-0.0006 95% of the time) per combo.
+PREFLOP_EQUITY_169 = {
+    'AA': 0.8520, 'AKs': 0.6700, 'AQs': 0.6617, 'AJs': 0.6536, 'ATs': 0.6459, 'A9s': 0.6279, 'A8s': 0.6192, 'A7s': 0.6097, 'A6s': 0.5987, 'A5s': 0.5994, 'A4s': 0.5903, 'A3s': 0.5820, 'A2s': 0.5738,
+    'AKo': 0.6531, 'AQo': 0.6446, 'AJo': 0.6354, 'ATo': 0.6274, 'A9o': 0.6076, 'A8o': 0.5987, 'A7o': 0.5887, 'A6o': 0.5773, 'A5o': 0.5775, 'A4o': 0.5678, 'A3o': 0.5593, 'A2o': 0.5489,
+    'KK': 0.8242, 'KQs': 0.6337, 'KJs': 0.6253, 'KTs': 0.6179, 'K9s': 0.6000, 'K8s': 0.5829, 'K7s': 0.5753, 'K6s': 0.5664, 'K5s': 0.5580, 'K4s': 0.5498, 'K3s': 0.5404, 'K2s': 0.5323,
+    'KQo': 0.6144, 'KJo': 0.6062, 'KTo': 0.5972, 'K9o': 0.5780, 'K8o': 0.5601, 'K7o': 0.5511, 'K6o': 0.5423, 'K5o': 0.5326, 'K4o': 0.5232, 'K3o': 0.5141, 'K2o': 0.5056,
+    'QQ': 0.7998, 'QJs': 0.6027, 'QTs': 0.5947, 'Q9s': 0.5768, 'Q8s': 0.5598, 'Q7s': 0.5429, 'Q6s': 0.5359, 'Q5s': 0.5275, 'Q4s': 0.5184, 'Q3s': 0.5103, 'Q2s': 0.5019,
+    'QJo': 0.5810, 'QTo': 0.5727, 'Q9o': 0.5535, 'Q8o': 0.5359, 'Q7o': 0.5180, 'Q6o': 0.5101, 'Q5o': 0.5010, 'Q4o': 0.4917, 'Q3o': 0.4822, 'Q2o': 0.4729,
+    'JJ': 0.7746, 'JTs': 0.5757, 'J9s': 0.5565, 'J8s': 0.5402, 'J7s': 0.5232, 'J6s': 0.5068, 'J5s': 0.4999, 'J4s': 0.4908, 'J3s': 0.4830, 'J2s': 0.4736,
+    'JTo': 0.5524, 'J9o': 0.5324, 'J8o': 0.5152, 'J7o': 0.4965, 'J6o': 0.4785, 'J5o': 0.4717, 'J4o': 0.4619, 'J3o': 0.4523, 'J2o': 0.4440,
+    'TT': 0.7499, 'T9s': 0.5403, 'T8s': 0.5236, 'T7s': 0.5068, 'T6s': 0.4903, 'T5s': 0.4719, 'T4s': 0.4654, 'T3s': 0.4568, 'T2s': 0.4484,
+    'T9o': 0.5154, 'T8o': 0.4967, 'T7o': 0.4792, 'T6o': 0.4608, 'T5o': 0.4421, 'T4o': 0.4349, 'T3o': 0.4260, 'T2o': 0.4169,
+    '99': 0.7203, '98s': 0.5080, '97s': 0.4902, '96s': 0.4745, '95s': 0.4571, '94s': 0.4389, '93s': 0.4327, '92s': 0.4242,
+    '98o': 0.4806, '97o': 0.4631, '96o': 0.4451, '95o': 0.4267, '94o': 0.4070, '93o': 0.3999, '92o': 0.3911,
+    '88': 0.6920, '87s': 0.4790, '86s': 0.4626, '85s': 0.4454, '84s': 0.4269, '83s': 0.4089, '82s': 0.4024,
+    '87o': 0.4505, '86o': 0.4326, '85o': 0.4145, '84o': 0.3941, '83o': 0.3750, '82o': 0.3682,
+    '77': 0.6621, '76s': 0.4536, '75s': 0.4365, '74s': 0.4186, '73s': 0.4006, '72s': 0.3811,
+    '76o': 0.4234, '75o': 0.4053, '74o': 0.3848, '73o': 0.3657, '72o': 0.3456,
+    '66': 0.6331, '65s': 0.4317, '64s': 0.4135, '63s': 0.3954, '62s': 0.3771,
+    '65o': 0.3998, '64o': 0.3800, '63o': 0.3610, '62o': 0.3408,
+    '55': 0.6037, '54s': 0.4147, '53s': 0.3966, '52s': 0.3790,
+    '54o': 0.3817, '53o': 0.3628, '52o': 0.3428,
+    '44': 0.5704, '43s': 0.3865, '42s': 0.3680,
+    '43o': 0.3518, '42o': 0.3315,
+    '33': 0.5366, '32s': 0.3600,
+    '32o': 0.3234,
+    '22': 0.5030,
+}
+
 
 class Player(Bot):
     '''
@@ -28,74 +68,45 @@ class Player(Bot):
         '''
         self.allocations = [[], [], []]
         self.hole_strengths = [0, 0, 0]
-        self.MONTE_CARLO_ITERS = 100 # the number of Monte Carlo samples we will use
+        self.equity = self.build_equity_table() # every hole's strength, looked up before the game clock starts
     
-    def rank_to_numeric(self, rank):
-        if rank.isnumeric(): # 2-9
-            return int(rank)
-        elif rank == 'T': # 10 is T, so we need to specify it here
-            return 10
-        elif rank == 'J': # Face cards for the rest of them
-            return 11
-        elif rank == 'Q':
-            return 12
-        elif rank == 'K':
-            return 13
-        else: # Ace (A) is the only one left
-            return 14
-
     def sort_cards_by_rank(self, cards):
-        return sorted(cards, reverse = True, key = lambda x: self.rank_to_numeric(x[0])) # we want it in descending order
+        return sorted(cards, reverse = True, key = lambda x: _RANK[x[0]]) # we want it in descending order
 
-    def calculate_strength(self, hole, iters): 
+    def calculate_strength(self, hole):
         '''
-        A Monte Carlo method meant to estimate the win probability of a pair of 
-        hole cards. Simlulates 'iters' games and determines the win rates of our cards
+        Looks up the preflop win probability of a pair of hole cards in PREFLOP_EQUITY_169.
 
         Arguments:
         hole: a list of our two hole cards
-        iters: a integer that determines how many Monte Carlo samples to take
 
         Returns: win probability, expressed as a float between 0 and 1
         '''
+        rank_1, rank_2 = hole[0][0], hole[1][0]
+        if _RANK[rank_1] < _RANK[rank_2]: # the chart lists the higher rank first
+            rank_1, rank_2 = rank_2, rank_1
+
+        if rank_1 == rank_2: # pocket pair
+            return PREFLOP_EQUITY_169[rank_1 + rank_2]
+        elif hole[0][1] == hole[1][1]:
+            return PREFLOP_EQUITY_169[rank_1 + rank_2 + 's']
+        else:
+            return PREFLOP_EQUITY_169[rank_1 + rank_2 + 'o']
+
+    def build_equity_table(self):
+        '''
+        Looks up every possible hole once so assign_holes only needs a dict lookup mid-game.
 
-        deck = eval7.Deck() # eval7 object!
-        hole_cards = [eval7.Card(card) for card in hole] # card objects, used to evaliate hands
-
-        for card in hole_cards: # remove cards that we know about! they shouldn't come up in simulations
-            deck.cards.remove(card)
-
-        score = 0
-
-        for _ in range(iters): # take 'iters' samples
-            deck.shuffle() # make sure our samples are random
-
-            _COMM = 5 # the number of cards we need to draw
-            _OPP = 2
-
-            draw = deck.peek(_COMM + _OPP)
-
-            opp_hole = draw[: _OPP]
-            community = draw[_OPP: ]
-
-            our_hand = hole_cards + community # the two showdown hands
-            opp_hand = opp_hole + community
-
-            our_hand_value = eval7.evaluate(our_hand) # the ranks of our hands (only useful for comparisons)
-            opp_hand_value = eval7.evaluate(opp_hand)
-
-            if our_hand_value > opp_hand_value: # we win!
-                score += 2
-            
-            elif our_hand_value == opp_hand_value: # we tie.
-                score += 1
-            
-            else: # we lost...
-                score += 0
-        
-        hand_strength = score / (2 * iters) #this is our win probability!
+        Arguments:
+        Nothing.
 
-        return hand_strength
+        Returns:
+        A dict from frozenset of the two card strings to that hole's win probability.
+        '''
+        equity = {}
+        for hole in itertools.combinations(_CODE, 2): # every pair of the 52 cards
+            equity[frozenset(hole)] = self.calculate_strength(list(hole))
+        return equity
 
     def allocate_cards(self, my_cards):
         '''
@@ -111,79 +122,64 @@ class Player(Bot):
         Nothing.
         '''
 
-        ranks = {}
-        suits = {}
+        codes = [_CODE[card] for card in my_cards]
+        rank_masks = [0] * 13 # bit s of rank_masks[r] is set if we hold rank r in suit s
+        suit_counts = [0] * 4 # how many of our cards share each suit
 
-        for card in my_cards:
-            card_rank = card[0]
-            card_suit = card[1]
+        for code in codes:
+            rank_masks[code >> 2] |= 1 << (code & 3)
+            suit_counts[code & 3] += 1
 
-            if card_rank in ranks: # if card with same rank already seen
-                ranks[card_rank].append(card)
-
-            else: # map card_rank to new list containing current card
-                ranks[card_rank] = [card]
-
-            if card_suit in suits:
-                suits[card_suit].append(card)
-
-            else:
-                suits[card_suit] = [card]
-        
         singles = []
         pairs = []
         thirds = []
 
-        for rank in ranks:
-            cards = ranks[rank]
+        for card, code in zip(my_cards, codes): # ranks in the order we were dealt them
+            rank = code >> 2
+            count = _BITS[rank_masks[rank]] # how many of this rank we hold
 
-            if len(cards) == 2:
-                pairs += cards
+            if count == 0: # already grouped this rank
+                continue
 
-            elif len(cards) == 3: # TODO sort by number of suit repetitions
-                suit_drawn = []
-                suit_undrawn = []
+            rank_masks[rank] = 0
 
-                for card in cards:
-                    if len(suits[card[1]]) > 1:
-                        suit_drawn.append(card)
-                    else:
-                        suit_undrawn.append(card)
+            if count == 1: # single
+                singles.append(card)
+                continue
 
-                ordered_cards = suit_drawn + suit_undrawn
-                thirds.append(ordered_cards[0]) # set aside to put at lowest board
-                pairs += ordered_cards[1], ordered_cards[2]
-                        
+            if count == 2:
+                pairs.extend([other for other, other_code in zip(my_cards, codes) if other_code >> 2 == rank])
+                continue
 
-            elif len(cards) == 4: # TODO sort by number of suit repetitions
-                suit_drawn = []
-                suit_undrawn = []
+            suit_drawn = []
+            suit_undrawn = []
 
-                for card in cards:
-                    if len(suits[card[1]]) > 1:
-                        suit_drawn.append(card)
+            for other, other_code in zip(my_cards, codes):
+                if other_code >> 2 == rank:
+                    if suit_counts[other_code & 3] > 1:
+                        suit_drawn.append(other)
                     else:
-                        suit_undrawn.append(card)
+                        suit_undrawn.append(other)
 
-                pairs += suit_drawn + suit_undrawn # if suit drawn, less prob of a flush so put first
+            if count == 3: # TODO sort by number of suit repetitions
+                suit_drawn.extend(suit_undrawn) # suit drawn cards first
+                thirds.append(suit_drawn[0]) # set aside to put at lowest board
+                pairs.append(suit_drawn[1])
+                pairs.append(suit_drawn[2])
 
-            else: # single
-                singles += cards
+            else: # four of a kind TODO sort by number of suit repetitions
+                pairs.extend(suit_drawn) # if suit drawn, less prob of a flush so put first
+                pairs.extend(suit_undrawn)
 
-        ordered_ranks = sorted([card[0] for card in singles])
-        ordered_singles = thirds # copy thirds at beginning of list
-        
-        while singles:
-            for i in range(len(singles)):
-                if singles[i][0] == ordered_ranks[0]:
-                    ordered_ranks.pop(0)
-                    ordered_singles.append(singles.pop(i)) # remove from list and append to ordered_singles
-                    break # stop looping, otherwise will raise IndexError because of pop
+        ordered_singles = thirds # thirds at beginning of list, then singles weakest first
+        singles.sort(key=_CODE.__getitem__) # singles never share a rank, so their codes sort in rank order
+        ordered_singles.extend(singles)
 
         if len(pairs) > 0:
             self.strong_hole = True
 
-        combined_allocation = ordered_singles + pairs # strongest hands at end
+        combined_allocation = ordered_singles # strongest hands at end
+        combined_allocation.extend(pairs)
 
         for i in range(NUM_BOARDS):
             hand = [combined_allocation[2*i], combined_allocation[2*i + 1]]
@@ -195,24 +191,16 @@ class Player(Bot):
         holes_and_strengths = [] # keep track of holes and their strengths
 
         for hole in hole_cards:
-            strength = self.calculate_strength(hole, self.MONTE_CARLO_ITERS) # use our monte carlo sim!
+            strength = self.equity[frozenset(hole)] # looked up once in __init__
             holes_and_strengths.append((hole, strength))
         
-        holes_and_strengths = sorted(holes_and_strengths, key=lambda x: x[1]) # sort them by strength
+        holes_and_strengths.sort(key=lambda x: x[1]) # sort them by strength
 
-        if random.random() < 0.15: # swap strongest with second, makes our strategy non-deterministic! TODO calculate Nash?
-            temp = holes_and_strengths[2]
-            holes_and_strengths[2] = holes_and_strengths[1]
-            holes_and_strengths[1] = temp
-        
-        if random.random() < 0.15: # swap second with last, makes us even more random
-            temp = holes_and_strengths[1]
-            holes_and_strengths[1] = holes_and_strengths[0]
-            holes_and_strengths[0] = temp
-        
-        for i in range(NUM_BOARDS): # we have our final board allocations!
-            self.allocations[i] = holes_and_strengths[i][0]
-            self.hole_strengths[i] = holes_and_strengths[i][1]
+        perm = random.choices(_PERMS, cum_weights=_PERM_CUM_WEIGHTS)[0] # sometimes shuffle, makes our strategy non-deterministic! TODO calculate Nash?
+
+        for i, src in enumerate(perm): # we have our final board allocations!
+            self.allocations[i] = holes_and_strengths[src][0]
+            self.hole_strengths[i] = holes_and_strengths[src][1]
 
 
     def handle_new_round(self, game_state, round_state, active):
@@ -234,8 +222,9 @@ class Player(Bot):
         my_cards = round_state.hands[active]  # your six cards at teh start of the round
         big_blind = bool(active)  # True if you are the big blind
         
-        allocated_holes = self.allocate_cards(my_cards)
-        self.allocate_cards(my_cards)
+        self.allocate_cards(my_cards) # sets self.allocations
+        self.assign_holes(self.allocations) # orders them by strength and sets self.hole_strengths, get_actions bets on these all round
+        assert all(self.hole_strengths[i] == self.equity[frozenset(self.allocations[i])] for i in range(NUM_BOARDS)), 'strengths out of sync with our holes!'
 
     def handle_round_over(self, game_state, terminal_state, active):
         '''
@@ -282,57 +271,80 @@ class Player(Bot):
         legal_actions = round_state.legal_actions()  # the actions you are allowed to take
         street = round_state.street  # 0, 3, 4, or 5 representing pre-flop, flop, turn, or river respectively
         my_cards = round_state.hands[active]  # your cards across all boards
-        board_cards = [board_state.deck if isinstance(board_state, BoardState) else board_state.previous_state.deck for board_state in round_state.board_states] # the board cards
-        my_pips = [board_state.pips[active] if isinstance(board_state, BoardState) else 0 for board_state in round_state.board_states] # the number of chips you have contributed to the pot on each board this round of betting
-        opp_pips = [board_state.pips[1-active] if isinstance(board_state, BoardState) else 0 for board_state in round_state.board_states] # the number of chips your opponent has contributed to the pot on each board this round of betting
-        continue_cost = [opp_pips[i] - my_pips[i] for i in range(NUM_BOARDS)] #the number of chips needed to stay in each board's pot
+        board_cards = [] # the board cards
+        my_pips = [] # the number of chips you have contributed to the pot on each board this round of betting
+        opp_pips = [] # the number of chips your opponent has contributed to the pot on each board this round of betting
+        continue_cost = [] #the number of chips needed to stay in each board's pot
+        for board_state in round_state.board_states: # one pass fills all four
+            if isinstance(board_state, BoardState):
+                board_deck = board_state.deck
+                board_my_pip = board_state.pips[active]
+                board_opp_pip = board_state.pips[1-active]
+            else:
+                board_deck = board_state.previous_state.deck
+                board_my_pip = 0
+                board_opp_pip = 0
+            board_cards.append(board_deck)
+            my_pips.append(board_my_pip)
+            opp_pips.append(board_opp_pip)
+            continue_cost.append(board_opp_pip - board_my_pip)
         my_stack = round_state.stacks[active]  # the number of chips you have remaining
         opp_stack = round_state.stacks[1-active]  # the number of chips your opponent has remaining
         stacks = [my_stack, opp_stack]
         net_upper_raise_bound = round_state.raise_bounds()[1] # max raise across 3 boards
         net_cost = 0 # keep track of the net additional amount you are spending across boards this round
-        
+        random_random = random.random # local names are quicker to look up than globals in the loop below
+        raise_action, call_action, check_action, fold_action = RaiseAction, CallAction, CheckAction, FoldAction
 
         my_actions = [None] * NUM_BOARDS # initializing [None, None, None]
         for i in range(NUM_BOARDS):
-            if AssignAction in legal_actions[i]:
+            bs = round_state.board_states[i] # this board's state
+            la = legal_actions[i] # what we can do on this board
+            mp = my_pips[i]
+            op = opp_pips[i]
+            cc = continue_cost[i]
+
+            if AssignAction in la:
                 cards = self.allocations[i] # assign our cards that we made earlier
                 my_actions[i] = AssignAction(cards) # add to our actions
 
-            elif isinstance(round_state.board_states[i], TerminalState): #make sure the game isn't over at this board
-                my_actions[i] = CheckAction() #check if it is
+            elif isinstance(bs, TerminalState): #make sure the game isn't over at this board
+                my_actions[i] = check_action() #check if it is
             
             else: #do we add more resources?
-                board_cont_cost = continue_cost[i] #we need to pay this to keep playing
-                board_total = round_state.board_states[i].pot #amount before we started betting
-                pot_total = my_pips[i] + opp_pips[i] + board_total #total money in the pot right now
-                min_raise, max_raise = round_state.board_states[i].raise_bounds(active, round_state.stacks)
+                board_cont_cost = cc #we need to pay this to keep playing
+                board_total = bs.pot #amount before we started betting
+                pot_total = mp + op + board_total #total money in the pot right now
                 strength = self.hole_strengths[i]
+                can_raise = raise_action in la
 
-                if street < 3: #pre-flop
-                    raise_ammount = int(my_pips[i] + board_cont_cost + 0.4 * (pot_total + board_cont_cost)) #play a little conservatively pre-flop
-                else:
-                    raise_ammount = int(my_pips[i] + board_cont_cost + 0.75 * (pot_total + board_cont_cost)) #raise the stakes deeper into the game
-                
-                raise_ammount = max([min_raise, raise_ammount]) #make sure we have a valid raise
-                raise_ammount = min([max_raise, raise_ammount])
+                if can_raise: # only size a raise when we're allowed to make one
+                    min_raise, max_raise = bs.raise_bounds(active, round_state.stacks)
+
+                    if street < 3: #pre-flop
+                        raise_ammount = int(mp + board_cont_cost + 0.4 * (pot_total + board_cont_cost)) #play a little conservatively pre-flop
+                    else:
+                        raise_ammount = int(mp + board_cont_cost + 0.75 * (pot_total + board_cont_cost)) #raise the stakes deeper into the game
+                    
+                    raise_ammount = max([min_raise, raise_ammount]) #make sure we have a valid raise
+                    raise_ammount = min([max_raise, raise_ammount])
 
-                raise_cost = raise_ammount - my_pips[i] #how much it costs to make that raise
+                    raise_cost = raise_ammount - mp #how much it costs to make that raise
 
-                if RaiseAction in legal_actions[i] and (raise_cost <= my_stack - net_cost): #raise if we can and if we can afford it
-                    commit_action = RaiseAction(raise_ammount)
+                if can_raise and (raise_cost <= my_stack - net_cost): #raise if we can and if we can afford it
+                    commit_action = raise_action(raise_ammount)
                     commit_cost = raise_cost
                 
-                elif CallAction in legal_actions[i] and (board_cont_cost <= my_stack - net_cost): #call if we can afford it!
-                    commit_action = CallAction()
+                elif call_action in la and (board_cont_cost <= my_stack - net_cost): #call if we can afford it!
+                    commit_action = call_action()
                     commit_cost = board_cont_cost #the cost to call is board_cont_cost
                 
-                elif CheckAction in legal_actions[i]: #try to check if we can
-                    commit_action = CheckAction()
+                elif check_action in la: #try to check if we can
+                    commit_action = check_action()
                     commit_cost = 0
                 
                 else: #we have to fold 
-                    commit_action = FoldAction()
+                    commit_action = fold_action()
                     commit_cost = 0
 
 
@@ -347,31 +359,31 @@ class Player(Bot):
 
                     if strength >= pot_odds: #Positive Expected Value!! at least call!!
 
-                        if strength > 0.5 and random.random() < strength: #raise sometimes, more likely if our hand is strong
+                        if strength > 0.5 and random_random() < strength: #raise sometimes, more likely if our hand is strong
                             my_actions[i] = commit_action
                             net_cost += commit_cost
                         
                         else: # try to call if we don't raise
                             if (board_cont_cost <= my_stack - net_cost): #we call because we can afford it and it's +EV
-                                my_actions[i] = CallAction()
+                                my_actions[i] = call_action()
                                 net_cost += board_cont_cost
                                 
                             else: #we can't afford to call :(  should have managed our stack better
-                                my_actions[i] = FoldAction()
+                                my_actions[i] = fold_action()
                                 net_cost += 0
                     
                     else: #Negative Expected Value!!! FOLD!!!
-                        my_actions[i] = FoldAction()
+                        my_actions[i] = fold_action()
                         net_cost += 0
                 
                 else: #board_cont_cost == 0, we control the action
 
-                    if random.random() < strength: #raise sometimes, more likely if our hand is strong
+                    if random_random() < strength: #raise sometimes, more likely if our hand is strong
                         my_actions[i] = commit_action
                         net_cost += commit_cost
 
                     else: #just check otherwise
-                        my_actions[i] = CheckAction()
+                        my_actions[i] = check_action()
                         net_cost += 0
 
         return my_actions